@@ -4,16 +4,16 @@ from tkinter import ttk
 from tkinter import messagebox
 import threading
 import time
+from collections import OrderedDict, deque
 from typing import Dict, Any, List, Tuple, Optional
-import sounddevice as sd
 import numpy as np
 import os
 import sys
 import configparser
 from pathlib import Path
-import serial
-import serial.tools.list_ports
 from glyphs import GLYPHS
+# sounddevice（PortAudio の読み込み）と pyserial は使う処理の中で import する
+# （起動時にウィンドウが出るまでの時間を短くし、PortAudio が無くても起動できるようにする）
 
 # PyInstallerの実行ファイル対応: リソースパスを取得する関数
 def get_resource_path(relative_path: str) -> Path:
@@ -52,20 +52,23 @@ class PTTControl:
         if self.serial_port:
             self.close()
         
+        import serial
         self.port_name = port_name
         try:
-            self.serial_port = serial.Serial(
-                port=port_name,
+            # ポートを指定せずに作り、RTS/DTR を OFF にしてから開く。
+            # pyserial はオープン時にこの状態を適用するので、開いた直後に PTT が一瞬
+            # ON になることも、開いた後で制御線を書き直すこともない
+            serial_port = serial.Serial(
                 baudrate=9600,
                 timeout=1,
                 write_timeout=1,
                 exclusive=True
             )
-            
-            if not self.serial_port.is_open:
-                self.serial_port.open()
-            
-            self.update_lines()
+            serial_port.rts = False
+            serial_port.dtr = False
+            serial_port.port = port_name
+            serial_port.open()
+            self.serial_port = serial_port
             
         except serial.SerialException as e:
             raise Exception(f"シリアルポート {port_name} のオープンに失敗しました: {str(e)}")
@@ -86,27 +89,19 @@ class PTTControl:
     def update_lines(self) -> None:
         if not self.serial_port or not self.serial_port.is_open:
             return
-            
-        try:
-            if self.use_rts:
-                self.serial_port.rts = False  # False = High = PTT OFF
-            else:
-                self.serial_port.rts = False
-                
-            time.sleep(0.1)  # 制御線の安定化のため
-            if self.use_dtr:
-                self.serial_port.dtr = False  # False = Low = PTT OFF
-            else:
-                self.serial_port.dtr = False
-                
-        except Exception as e:
-            raise
+
+        # 制御線を PTT OFF（RTS/DTR とも False）に揃える。
+        # pyserial は最後に設定した状態を保持しているので、変わらない線には書き込まない
+        if self.serial_port.rts:
+            self.serial_port.rts = False
+        if self.serial_port.dtr:
+            self.serial_port.dtr = False
 
     def set_ptt(self, state: bool) -> None:
         if self.serial_port:
-            if self.use_rts:
+            if self.use_rts and self.serial_port.rts != state:
                 self.serial_port.rts = state  # True = Low = PTT ON, False = High = PTT OFF
-            if self.use_dtr:
+            if self.use_dtr and self.serial_port.dtr != state:
                 self.serial_port.dtr = state  # False = Low = PTT OFF, True = High = PTT ON
 
 # ---- サウンド設定 ----
@@ -121,6 +116,10 @@ SAMPLES_PER_CHAR = SAMPLES_PER_PIXEL * PIXELS_PER_COLUMN * COLUMNS_PER_CHAR
 # 音声出力の設定
 BUFFER_SAMPLES = SAMPLES_PER_CHAR * 2  # バッファサイズを文字サイズの倍数に
 LATENCY = 0.2  # 出力レイテンシー（秒）
+# コールバック1回あたりのフレーム数。0 はホストAPIに最適なサイズ（可変）を任せる
+# （コールバックは任意のフレーム数を処理できるので固定する必要はない）
+AUDIO_BLOCKSIZE = 0
+MESSAGE_BUFFER_CHARS = 32  # 送信文の作業用バッファの初期サイズ（文字数）
 
 class DeviceInfo:
     """サウンドデバイス情報を保持するクラス"""
@@ -129,33 +128,51 @@ class DeviceInfo:
         self.max_output_channels: int = int(device_dict.get('max_output_channels', 0))
 
 
-def generate_tone(on: bool) -> np.ndarray:
-    """1ピクセル分の波形を生成（サンプル数を正確に保つ）"""
-    if on:
-        t = np.linspace(0, SAMPLES_PER_PIXEL / SAMPLE_RATE, SAMPLES_PER_PIXEL, False)
-        wave = 0.5 * np.sin(2 * np.pi * FREQ * t)
-    else:
-        wave = np.zeros(SAMPLES_PER_PIXEL)
-    return wave.astype(np.float32)
+# 文字波形キャッシュの形式: 振幅 1.0 を _PCM_FULL_SCALE とする int16（float32 の半分のメモリで済む）
+# float32 への変換と音量の適用は出力コールバックでまとめて行う
+_PCM_FULL_SCALE = 32767
+# 1文字分の位相が連続したトーン。ピクセルごとに位相 0 から始め直すと境目で波形が飛び、
+# 広帯域のノイズになるので、文字全体で1本のサイン波をオン/オフのマスクで切り出す
+_CHAR_CARRIER_PCM = np.round(
+    0.5 * np.sin(2 * np.pi * FREQ * np.arange(SAMPLES_PER_CHAR) / SAMPLE_RATE) * _PCM_FULL_SCALE
+).astype(np.int16)
+_CHAR_CARRIER_PCM.setflags(write=False)
+# 未定義の文字の代わりに送る1文字分の無音（読み取り専用で共有し、都度確保しない）
+_SILENT_CHAR = np.zeros(SAMPLES_PER_CHAR, dtype=np.int16)
+_SILENT_CHAR.setflags(write=False)
 
 def generate_silence(duration: float) -> np.ndarray:
     """無音区間を生成"""
     samples = int(SAMPLE_RATE * duration)
     return np.zeros(samples, dtype=np.float32)
 
-def load_glyphs() -> Dict[str, List[int]]:
+def _ensure_14_columns(glyph_data) -> np.ndarray:
+    """受け取ったグリフ列を必ず長さ14の uint16 配列にする（不足は右を 0 で埋め、超過は切り詰め）"""
+    if isinstance(glyph_data, np.ndarray) and glyph_data.dtype == np.uint16 and glyph_data.shape == (14,):
+        return glyph_data
+    cols = np.zeros(14, dtype=np.uint16)
+    if not isinstance(glyph_data, (list, tuple, np.ndarray)):
+        return cols
+    # 送信に使うのは下位 PIXELS_PER_COLUMN ビットだけなので 16 ビットに収める
+    src = np.asarray(glyph_data, dtype=np.int64)[:14]
+    cols[:len(src)] = src & 0xFFFF
+    return cols
+
+def load_glyphs() -> Dict[str, np.ndarray]:
     try:
         from glyphs import GLYPHS
         # GLYPHS は BDF 変換ツールで 14 列化されている前提
         # 万が一列数が12なら右側に 0 を追加して 14 にする
         def _norm(g):
-            if not isinstance(g, (list,tuple)):
-                return [0]*14
-            lst = list(g)
-            if len(lst) >= 14:
-                return lst[:14]
-            lst.extend([0]*(14 - len(lst)))
-            return lst
+            if isinstance(g, int):
+                # BDFconv --packed 形式（列 x を 16*x ビット目から配置した1つの整数）
+                return np.array([(g >> (16 * x)) & 0xFFFF for x in range(14)], dtype=np.uint16)
+            return _ensure_14_columns(g)
+        values = list(GLYPHS.values())
+        if all(isinstance(v, (list, tuple)) and len(v) == 14 for v in values):
+            # すべて14列のリストなら1回の変換で (N, 14) 配列にし、各行のビューを値にする
+            table = (np.array(values, dtype=np.int64).reshape(-1, 14) & 0xFFFF).astype(np.uint16)
+            return dict(zip(GLYPHS.keys(), table))
         return {k: _norm(v) for k,v in GLYPHS.items()}
     except ImportError:
         print("警告: グリフファイル (glyphs.py) が見つかりません。")
@@ -164,41 +181,44 @@ def load_glyphs() -> Dict[str, List[int]]:
 
 GLYPHS = load_glyphs()
 
-def _ensure_14_columns(glyph_data: List[int]) -> List[int]:
-    """受け取ったグリフ列リストを必ず長さ14にする（不足は右パディング、超過は切り詰め）"""
-    if not isinstance(glyph_data, (list, tuple)):
-        return [0] * 14
-    cols = list(glyph_data)
-    if len(cols) >= 14:
-        return cols[:14]
-    cols.extend([0] * (14 - len(cols)))
-    return cols
-
 # ASCII文字のグリフデータ（デフォルトは空白中心の14列）
 # NOTE: 実行時に生成済みの `ascii_glyphs.py` があればそれを優先して読み込みます
 ASCII_GLYPHS = {
-    ' ': [0x0000] * 14,
+    ' ': _ensure_14_columns([0x0000] * 14),
 }
 
 # generated ascii_glyphs.py を優先して読み込み、なければ最小フォールバックを用意
 try:
     from ascii_glyphs import GLYPHS as ASCII_SOURCE
-    def _normalize_to_14(cols: List[int]) -> List[int]:
-        if not isinstance(cols, (list, tuple)):
-            return [0] * 14
-        lst = list(cols)
-        if len(lst) >= 14:
-            return lst[:14]
-        lst.extend([0] * (14 - len(lst)))
-        return lst
-    ASCII_GLYPHS = {k: _normalize_to_14(v) for k, v in ASCII_SOURCE.items()}
+    ASCII_GLYPHS = {k: _ensure_14_columns(v) for k, v in ASCII_SOURCE.items()}
     _ASCII_AVAILABLE = True
 except Exception as _ascii_ex:
     # ascii_glyphs.py が見つからない場合は空白のみ定義した安全なフォールバックを使用
-    ASCII_GLYPHS = {' ': [0x0000] * 14}
+    ASCII_GLYPHS = {' ': _ensure_14_columns([0x0000] * 14)}
     _ASCII_AVAILABLE = False
     _ASCII_IMPORT_ERROR = _ascii_ex
 
+def _build_glyph_table(*sources: Dict[str, np.ndarray]) -> Tuple[np.ndarray, List[Dict[str, int]]]:
+    """
+    グリフ辞書（文字 -> 14列の配列またはリスト）を1つの (N, 14) uint16 配列にまとめる。
+    戻り値は (表, 辞書ごとの 文字 -> 行番号 の索引のリスト)。
+    """
+    rows: List[np.ndarray] = []
+    indexes: List[Dict[str, int]] = []
+    for source in sources:
+        index: Dict[str, int] = {}
+        for ch, cols in source.items():
+            index[ch] = len(rows)
+            rows.append(_ensure_14_columns(cols))
+        indexes.append(index)
+    # 各行は _ensure_14_columns で長さ14の uint16 配列に揃っているので、そのまま積み重ねる
+    table = np.stack(rows) if rows else np.zeros((0, COLUMNS_PER_CHAR), dtype=np.uint16)
+    table.setflags(write=False)
+    return table, indexes
+
+# 送信時に参照するグリフ表（ASCII と日本語グリフを1つの配列にまとめ、文字ごとの行番号で引く）
+_GLYPH_ROWS, (_ASCII_INDEX, _GLYPH_INDEX) = _build_glyph_table(ASCII_GLYPHS, GLYPHS)
+
 
 def _rows_to_cols(rows_list: List[int], cols: int = 14, rows: int = 14) -> List[int]:
     """
@@ -206,6 +226,7 @@ def _rows_to_cols(rows_list: List[int], cols: int = 14, rows: int = 14) -> List[
     列ベース (cols 個の整数、各整数は下→上にビットが詰められる) に変換する。
     - rows_list[0] は上行、rows_list[rows-1] は下行と仮定する。
     - 入力行のビットは左が MSB と仮定する（CXX の出力に合わせる）。
+    - rows / cols は 64 以下（1列・1行を 64 ビット語として扱う）。
     """
     rlist = list(rows_list)
     if len(rlist) < rows:
@@ -213,94 +234,166 @@ def _rows_to_cols(rows_list: List[int], cols: int = 14, rows: int = 14) -> List[
     else:
         rlist = rlist[:rows]
 
-    max_bitlen = 0
-    for v in rlist:
-        if v:
-            max_bitlen = max(max_bitlen, v.bit_length())
+    max_bitlen = max((v.bit_length() for v in rlist if v), default=0)
     effective_width = max(max_bitlen, cols)
-
-    cols_out: List[int] = []
-    for col_index in range(cols):
-        col_val = 0
-        src_bitpos = effective_width - 1 - col_index
-        for row_index in range(rows):
-            row_word = rlist[row_index]
-            bit = (row_word >> src_bitpos) & 1 if src_bitpos >= 0 else 0
-            if bit:
-                out_bitpos = (rows - 1 - row_index)  # 下->上に詰める
-                col_val |= (1 << out_bitpos)
-        cols_out.append(col_val)
-    return cols_out
+    # 各行の左端（MSB 側）から cols ビットを切り出し、64ビット語（ビッグエンディアン）の
+    # 下位に置いて unpackbits で (rows, cols) のビット行列にする（列 0 = 左端）
+    low = effective_width - cols
+    words = np.array([(v >> low) & ((1 << cols) - 1) for v in rlist], dtype='>u8')
+    bits = np.unpackbits(words.view(np.uint8)).reshape(rows, 64)[:, 64 - cols:]
+    # 転置して列ごとに rows ビットを並べ、行 0（上）が最上位になるよう packbits で詰め直す
+    # （行 r は (rows - 1 - r) ビット目 = 下->上に詰める）
+    col_bits = np.zeros((cols, 64), dtype=np.uint8)
+    col_bits[:, 64 - rows:] = bits.T
+    return np.packbits(col_bits, axis=1).view('>u8').ravel().tolist()
 
 def _count_nonzero(items: List[int]) -> int:
     return sum(1 for v in items if v != 0)
 
-def send_char(ch: str) -> np.ndarray:
-    """1文字分の波形を生成（14x14固定の仕様に合わせる）
+# 文字 -> 1文字分の波形（読み取り専用）。グリフと音声設定は実行中に変わらないので使い回す
+# 1文字 約 76KB なので、上限（約 19MB）を超えたら最も長く使われていない文字から捨てる
+_CHAR_CACHE_MAX = 256
+_CHAR_CACHE: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+
+def _cache_char(ch: str, wave: np.ndarray) -> None:
+    """波形を `_CHAR_CACHE` に入れ、上限を超えた分を古い順に捨てる"""
+    _CHAR_CACHE[ch] = wave
+    _CHAR_CACHE.move_to_end(ch)
+    while len(_CHAR_CACHE) > _CHAR_CACHE_MAX:
+        _CHAR_CACHE.popitem(last=False)
+
+
+def _search_glyph_row(ch: str) -> Optional[int]:
+    """文字に対応するグリフの `_GLYPH_ROWS` 上の行番号を索引から探す。見つからなければ None
     - ASCII は `ASCII_GLYPHS` を最優先で使用（大文字/小文字を順に試す）。
     - 見つからなければ `GLYPHS` を参照する（日本語など）。
+    """
+    # ASCII 優先（大文字→小文字→そのままの順）
+    if ord(ch) <= 0x7F:
+        candidates = [ch, ch.upper(), ch.lower()]
+        for c in candidates:
+            if c in _ASCII_INDEX:
+                return _ASCII_INDEX[c]
+        # ASCII_GLYPHS に見つからなければ GLYPHS を参照（互換性のため）
+        for c in candidates:
+            if c in _GLYPH_INDEX:
+                return _GLYPH_INDEX[c]
+        return None
+    # 非ASCII: まず GLYPHS を直接参照
+    if ch in _GLYPH_INDEX:
+        return _GLYPH_INDEX[ch]
+    for c in (ch, ch.upper(), ch.lower()):
+        if c in _GLYPH_INDEX:
+            return _GLYPH_INDEX[c]
+    return None
+
+def _build_glyph_lookup() -> Dict[str, int]:
+    """文字 -> `_GLYPH_ROWS` の行番号 の表を作る（大文字/小文字の候補と ASCII 優先を適用済み）"""
+    # 非ASCII はグリフのキーそのものが最優先の候補なので、索引をそのまま使う
+    lookup = {ch: row for ch, row in _GLYPH_INDEX.items() if len(ch) != 1 or ord(ch) > 0x7F}
+    for code in range(128):
+        row = _search_glyph_row(chr(code))
+        if row is not None:
+            lookup[chr(code)] = row
+    return lookup
+
+# 検索の結果をまとめた表（グリフのある文字は辞書の参照1回で行番号が決まる）
+_GLYPH_LOOKUP = _build_glyph_lookup()
+
+def _find_glyph_row(ch: str) -> Optional[int]:
+    """文字に対応するグリフの `_GLYPH_ROWS` 上の行番号を返す。見つからなければ None
+    表にない文字だけ大文字/小文字の候補を探し、見つかった結果は表に追加する。
+    """
+    row = _GLYPH_LOOKUP.get(ch)
+    if row is None:
+        row = _search_glyph_row(ch)
+        if row is not None:
+            _GLYPH_LOOKUP[ch] = row
+    return row
+
+def _render_glyphs(glyph_rows: np.ndarray) -> np.ndarray:
+    """(N, 14) のグリフ表（各列の bit 0 が上の行）を (N, SAMPLES_PER_CHAR) の int16 波形にまとめて変換する"""
+    rows = np.ascontiguousarray(np.asarray(glyph_rows)[:, :COLUMNS_PER_CHAR], dtype='<u2')
+    n = len(rows)
+    # 14列の16ビット語をリトルエンディアンのバイト列として1回の unpackbits で展開し、
+    # 各列の下位 14 ビット（bit 0 = 上の行から）を並べた 196 ピクセルのオン/オフを得る
+    bits = np.unpackbits(rows.view(np.uint8), bitorder='little').reshape(n, -1, 16)[:, :, :PIXELS_PER_COLUMN]
+    # 無音で初期化し、オンのピクセルだけに連続トーンの該当区間を書き込む（オフのピクセルには触れない）
+    out = np.zeros((n, SAMPLES_PER_CHAR), dtype=np.int16)
+    char_idx, pixel_idx = np.nonzero(bits.reshape(n, -1))
+    out.reshape(n, -1, SAMPLES_PER_PIXEL)[char_idx, pixel_idx] = _CHAR_CARRIER_PCM.reshape(-1, SAMPLES_PER_PIXEL)[pixel_idx]
+    return out
+
+def _render_glyph(glyph_cols: np.ndarray) -> np.ndarray:
+    """14列のグリフ1文字分を int16 波形に変換する（_render_glyphs の1文字版）"""
+    return _render_glyphs(np.asarray(glyph_cols)[None, :])[0]
+
+def prepare_chars(text: str) -> None:
+    """text に含まれる未キャッシュの文字の波形をまとめて生成し `_CHAR_CACHE` に入れる
+    （文字ごとに変換処理を呼ばず、1回の _render_glyphs で済ませる）
+    """
+    pending: Dict[str, int] = {}
+    for ch in set(text):
+        if ord(ch) < 128 and _ASCII_WAVE_CACHE[ord(ch)] is not None:
+            continue
+        if ch not in _CHAR_CACHE:
+            row = _find_glyph_row(ch)
+            if row is not None:
+                pending[ch] = row
+    if not pending:
+        return
+    waves = _render_glyphs(_GLYPH_ROWS[list(pending.values())])
+    for ch, wave in zip(pending, waves):
+        # 行のビューのままだと1文字捨てても一括生成した配列全体が残るので、文字ごとに独立した配列にする
+        wave = wave.copy()
+        wave.setflags(write=False)
+        _cache_char(ch, wave)
+
+def _build_ascii_wave_cache() -> List[Optional[np.ndarray]]:
+    """ASCII (0..127) の波形を起動時にまとめて生成し、ord(ch) で引ける128要素の表にする"""
+    table: List[Optional[np.ndarray]] = [None] * 128
+    found = [(code, _find_glyph_row(chr(code))) for code in range(128)]
+    found = [(code, row) for code, row in found if row is not None]
+    if found:
+        waves = _render_glyphs(_GLYPH_ROWS[[row for _, row in found]])
+        waves.setflags(write=False)
+        for (code, _), wave in zip(found, waves):
+            table[code] = wave
+    return table
+
+# ASCII は辞書の検索（大文字/小文字の候補）を省き、配列の添字1回で波形を得る
+_ASCII_WAVE_CACHE = _build_ascii_wave_cache()
+
+def send_char(ch: str) -> np.ndarray:
+    """1文字分の波形を生成（14x14固定の仕様に合わせる）
+    - グリフの検索は `_find_glyph_row`、波形化は `_render_glyph` で行う。
     - グリフは与えられたまま信じて変換は行わない（行→列自動変換は行わない）。
+    - 生成した波形は `_CHAR_CACHE` に保存し、2回目以降はそのまま返す（書き換え不可、最大 _CHAR_CACHE_MAX 文字）。
+    - 波形は int16（振幅 1.0 = _PCM_FULL_SCALE）。
     """
+    code = ord(ch)
+    if code < 128 and _ASCII_WAVE_CACHE[code] is not None:
+        return _ASCII_WAVE_CACHE[code]
+    cached = _CHAR_CACHE.get(ch)
+    if cached is not None:
+        _CHAR_CACHE.move_to_end(ch)
+        return cached
     try:
-        glyph_data = None
-
-        # ASCII 優先（大文字→小文字→そのままの順）
-        if ord(ch) <= 0x7F:
-            candidates = [ch, ch.upper(), ch.lower()]
-            for c in candidates:
-                if c in ASCII_GLYPHS:
-                    glyph_data = ASCII_GLYPHS[c]
-                    break
-            # ASCII_GLYPHS に見つからなければ GLYPHS を参照（互換性のため）
-            if glyph_data is None:
-                for c in candidates:
-                    if c in GLYPHS:
-                        glyph_data = GLYPHS[c]
-                        break
-        else:
-            # 非ASCII: まず GLYPHS を直接参照
-            if ch in GLYPHS:
-                glyph_data = GLYPHS[ch]
-            else:
-                for c in (ch, ch.upper(), ch.lower()):
-                    if c in GLYPHS:
-                        glyph_data = GLYPHS[c]
-                        break
-
-        if glyph_data is None:
+        row = _find_glyph_row(ch)
+        if row is None:
             print(f"未定義の文字: {ch}")
-            return np.zeros(SAMPLES_PER_CHAR, dtype=np.float32)
-
-        # グリフは与えられた形式をそのまま使う（信頼）。列数を14に整形するのみ。
-        glyph_cols = _ensure_14_columns(glyph_data)
-
-        # 固定14列でバッファ長を計算
-        columns = COLUMNS_PER_CHAR
-        total_samples = SAMPLES_PER_PIXEL * PIXELS_PER_COLUMN * columns
-        buffer = np.zeros(total_samples, dtype=np.float32)
-        sample_index = 0
-
-        # 列単位でエンコード（各列は PIXELS_PER_COLUMN ビット）
-        for col in range(columns):
-            data = int(glyph_cols[col])
-            for y in range(PIXELS_PER_COLUMN):
-                bit = (data >> y) & 1
-                wave = generate_tone(bit == 1)
-                end = sample_index + SAMPLES_PER_PIXEL
-                if end <= total_samples:
-                    buffer[sample_index:end] = wave
-                sample_index = end
-
-        # 文字の最後に短い無音区間を追加して同期を保つ（可能なら）
-        silence_samples = int(SAMPLE_RATE * 0.001)  # 1ms
-        if sample_index + silence_samples <= total_samples:
-            buffer[sample_index:sample_index + silence_samples] = 0
+            return _SILENT_CHAR
 
+        # グリフは与えられた形式をそのまま使う（信頼）。列数は表の作成時に14に整形済み。
+        buffer = _render_glyph(_GLYPH_ROWS[row])
+        buffer.setflags(write=False)
+        _cache_char(ch, buffer)
         return buffer
 
     except Exception as e:
         print(f"Error processing character '{ch}': {e}")
-        return np.zeros(SAMPLES_PER_CHAR, dtype=np.float32)
+        return _SILENT_CHAR
 
 class SettingsWindow:
     def __init__(self, parent: tk.Tk, app) -> None:
@@ -365,7 +458,8 @@ class SettingsWindow:
         ptt_frame.pack(fill='x', padx=10, pady=5)
 
         # COMポート選択 — 先頭に "なし" を追加
-        ports = ['なし'] + [port.device for port in serial.tools.list_ports.comports()]
+        # ポートの列挙は時間がかかることがあるので、まず現在の設定だけで表示し一覧は後から反映する
+        ports = ['なし'] + ([self.app.ptt.port_name] if self.app.ptt.port_name else [])
         self.port_var = tk.StringVar(value=(self.app.ptt.port_name if self.app.ptt.port_name else 'なし'))
         port_frame = ttk.Frame(ptt_frame)
         port_frame.pack(fill='x', padx=5, pady=5)
@@ -411,6 +505,32 @@ class SettingsWindow:
         ttk.Button(button_frame, text="保存", command=self.save_settings).pack(side='right', padx=5)
         ttk.Button(button_frame, text="キャンセル", command=self.window.destroy).pack(side='right')
 
+        threading.Thread(target=self._populate_ports_async, daemon=True).start()
+
+    def _populate_ports_async(self) -> None:
+        """COMポートの一覧を取得し、GUI スレッドで反映する（バックグラウンドスレッドで実行）"""
+        try:
+            import serial.tools.list_ports
+            ports = ['なし'] + [port.device for port in serial.tools.list_ports.comports()]
+        except Exception as e:
+            print(f"COMポート取得エラー: {e}")
+            return
+        try:
+            self.window.after(0, self._apply_port_list, ports)
+        except (RuntimeError, tk.TclError):
+            # ダイアログが既に閉じられている
+            pass
+
+    def _apply_port_list(self, ports: List[str]) -> None:
+        """取得した COMポート一覧をコンボボックスに反映する（GUI スレッドで実行）"""
+        if not self.window.winfo_exists():
+            return
+        self.port_combo['values'] = ports
+        try:
+            self.port_combo.current(ports.index(self.port_var.get()))
+        except ValueError:
+            self.port_combo.current(0)
+
     def save_settings(self) -> None:
         # デバイス選択を更新
         try:
@@ -449,7 +569,8 @@ class SettingsWindow:
         # 設定をINIファイルに保存（CONFIG_FILEグローバル変数を使用）
         config = configparser.ConfigParser()
         config['Sound'] = {
-            'device_name': self.device_var.get(),
+            # 一覧が空で何も選べない場合は、保存済みのデバイス名を消さずに残す
+            'device_name': self.device_var.get() or (self.app._saved_device_name or ''),
             'volume_level': str(self.volume_var.get())
         }
         config['PTT'] = {
@@ -499,42 +620,31 @@ class HellschreiberGUI:
             image=self.settings_icon,
             command=self.show_settings,
             relief='flat',
-            background=root.cget('background')
+            background=root.cget('background'),
+            state='disabled'  # デバイス一覧を取得するまでは押せないようにする
         )
         self.settings_button.pack(side='right', padx=5, pady=5)
 
 
-        # サウンドデバイスの取得とセットアップ
-        try:
-            devices = sd.query_devices()
-            self.audio_available = True
-        except Exception as e:
-            print(f"音声デバイス取得エラー: {e}")
-            devices = []
-            self.audio_available = False
-
-        self.output_devices: List[Tuple[int, DeviceInfo]] = [
-            (i, DeviceInfo(device)) for i, device in enumerate(devices) 
-            if isinstance(device, dict) and int(device.get('max_output_channels', 0)) > 0
-        ]
+        # サウンドデバイスの一覧は起動を待たせないよう別スレッドで取得し、取得後に反映する
+        self.audio_available = True
+        self.output_devices: List[Tuple[int, DeviceInfo]] = []
         
         # デバイス選択の初期化
         self.device_var = tk.StringVar()
         self.device_combo = ttk.Combobox(root, textvariable=self.device_var)  # 非表示のコンボボックス
-          # デバイスリストの設定
-        device_names = [dev[1].name for dev in self.output_devices]
-        self.device_combo['values'] = device_names
+        self.device_combo['values'] = []
         
         # INIファイルから設定を読み込み
         config = configparser.ConfigParser()
-        saved_device_name = None
+        self._saved_device_name = None
           # PTTコントロールの初期化
         self.ptt = PTTControl()
 
         if CONFIG_FILE.exists():
             try:
                 config.read(CONFIG_FILE, encoding='utf-8')
-                saved_device_name = config.get('Sound', 'device_name', fallback=None)
+                self._saved_device_name = config.get('Sound', 'device_name', fallback=None)
                 self.volume_level = float(config.get('Sound', 'volume_level', fallback='-20'))
 
                 # PTT設定の読み込み
@@ -549,37 +659,10 @@ class HellschreiberGUI:
                         pass
             except Exception:
                 pass
-        
-        # 保存されていたデバイスを探す
-        if saved_device_name:
-            for i, name in enumerate(device_names):
-                if name == saved_device_name:
-                    self.device_combo.current(i)
-                    break
-            else:  # 保存されていたデバイスが見つからない場合
-                if device_names:
-                    self.device_combo.current(0)
-        else:  # 保存された設定がない場合はデフォルトデバイスを使用
-            try:
-                if self.audio_available:
-                    default_device = sd.default.device[1]
-                else:
-                    default_device = None
-            except Exception:
-                default_device = None
-
-            if default_device is not None:
-                for i, (dev_id, _) in enumerate(self.output_devices):
-                    if dev_id == default_device:
-                        self.device_combo.current(i)
-                        break
-                else:
-                    if device_names:
-                        self.device_combo.current(0)
-            else:
-                # 音声が利用できない場合は空リストにしておく
-                if device_names:
-                    self.device_combo.current(0)
+
+        # メインループ開始後に取得スレッドを起動する（結果は root.after で GUI スレッドに渡すため）
+        self.root.after_idle(
+            lambda: threading.Thread(target=self._populate_devices_async, daemon=True).start())
         
         # フォント設定
         default_font = ('Yu Gothic UI', 12)
@@ -594,7 +677,8 @@ class HellschreiberGUI:
             root, 
             text="送信開始", 
             font=default_font,
-            command=self.start_transmission
+            command=self.start_transmission,
+            state='disabled'  # デバイス一覧を取得するまでは押せないようにする
         )
         self.send_button.pack(pady=5)
 
@@ -614,7 +698,95 @@ class HellschreiberGUI:
 
         # 音声ストリーム
         self.audio_stream = None
-        self.stream_lock = threading.Lock()  # ストリームアクセスの排他制御用
+        # ストリームの作り直し（コールドパス）だけを排他する。再生経路はキューの Condition のみを使う
+        self._init_lock = threading.Lock()
+        self._stream_ready = threading.Event()  # ストリームが開始済みで再生に使える状態か
+        self._stream_device_id: Optional[int] = None  # 現在のストリームの出力デバイス
+        # 再生待ちの波形キュー（送信スレッドが積み、PortAudio のコールバックが取り出す）
+        self._audio_queue: deque = deque()
+        self._audio_offset = 0  # キュー先頭の波形のうち出力済みのサンプル数
+        self._queued_samples = 0  # キューに残っている未出力サンプル数
+        self._samples_played = 0  # ストリーム開始からコールバックで出力したサンプル数
+        self._audio_cond = threading.Condition()
+        self._sending = False  # 送信中フラグ（送信済み表示の更新タイマーが参照）
+        # 送信文全体の波形を組み立てる作業用バッファ（2面を交互に使い、送信ごとの確保を避ける）
+        # 片方がまだ再生キューに残っていても、もう片方に次の送信文を組み立てられる
+        self._message_buffers = [np.empty(SAMPLES_PER_CHAR * MESSAGE_BUFFER_CHARS, dtype=np.int16)
+                                 for _ in range(2)]
+        self._message_buffer_index = 0
+
+    @property
+    def volume_level(self) -> float:
+        """出力レベル（dB）"""
+        return self._volume_level
+
+    @volume_level.setter
+    def volume_level(self, level: float) -> None:
+        # 再生のたびに 10 ** (dB / 20) を計算しないよう、変更時に倍率を求めておく
+        # （出力と同じ float32 で持ち、乗算が float64 に昇格しないようにする）
+        # 設定ファイルの値がスライダーの範囲外でも 0 dB を超えないようここで抑える
+        # （倍率が 1 以下なら出力は ±1.0 に収まるので、サンプルごとのクリップは不要）
+        level = min(max(float(level), -60.0), 0.0)
+        self._volume_level = level
+        # int16 の文字波形を float32 の出力に変換するときの倍率（音量込み）
+        self._pcm_gain = np.float32(10.0 ** (level / 20.0) / _PCM_FULL_SCALE)
+
+    def _populate_devices_async(self) -> None:
+        """サウンドデバイスの一覧を取得し、GUI スレッドで反映する（バックグラウンドスレッドで実行）"""
+        try:
+            import sounddevice as sd
+            devices = sd.query_devices()
+            available = True
+        except Exception as e:
+            print(f"音声デバイス取得エラー: {e}")
+            devices = []
+            available = False
+        try:
+            default_device = sd.default.device[1] if available else None
+        except Exception:
+            default_device = None
+        try:
+            self.root.after(0, self._apply_device_list, devices, available, default_device)
+        except (RuntimeError, tk.TclError):
+            # ウィンドウが既に閉じられている
+            pass
+
+    def _apply_device_list(self, devices, available: bool, default_device: Optional[int]) -> None:
+        """取得したデバイス一覧を出力デバイスの選択に反映する（GUI スレッドで実行）"""
+        self.audio_available = available
+        self.output_devices = [
+            (i, DeviceInfo(device)) for i, device in enumerate(devices) 
+            if isinstance(device, dict) and int(device.get('max_output_channels', 0)) > 0
+        ]
+        # デバイスリストの設定
+        device_names = [dev[1].name for dev in self.output_devices]
+        self.device_combo['values'] = device_names
+
+        # 保存されていたデバイスを探す
+        if self._saved_device_name:
+            for i, name in enumerate(device_names):
+                if name == self._saved_device_name:
+                    self.device_combo.current(i)
+                    break
+            else:  # 保存されていたデバイスが見つからない場合
+                if device_names:
+                    self.device_combo.current(0)
+        elif default_device is not None:  # 保存された設定がない場合はデフォルトデバイスを使用
+            for i, (dev_id, _) in enumerate(self.output_devices):
+                if dev_id == default_device:
+                    self.device_combo.current(i)
+                    break
+            else:
+                if device_names:
+                    self.device_combo.current(0)
+        else:
+            # 音声が利用できない場合は空リストにしておく
+            if device_names:
+                self.device_combo.current(0)
+
+        # 一覧が揃ったので設定と送信を受け付ける
+        self.settings_button.config(state='normal')
+        self.send_button.config(state='normal')
 
     def show_settings(self) -> None:
         """設定ウィンドウを表示"""
@@ -637,7 +809,7 @@ class HellschreiberGUI:
             messagebox.showerror("エラー", "出力デバイスが選択されていません。設定を確認してください。")
             return
 
-        # 先にオーディオストリームを初期化しておく（失敗時は通知して中止）
+        # 先にオーディオストリームを用意しておく（同じデバイスで動作中なら再利用。失敗時は通知して中止）
         try:
             self._initialize_audio_stream(device_id)
         except Exception as e:
@@ -670,8 +842,14 @@ class HellschreiberGUI:
         return None
         
     def _initialize_audio_stream(self, device_id: int) -> None:
-        """音声出力ストリームを初期化（例外を上位に伝える）"""
-        with self.stream_lock:
+        """音声出力ストリームを初期化（例外を上位に伝える）
+        同じデバイスのストリームが動作中ならそのまま使い、開き直さない。
+        """
+        with self._init_lock:
+            if (self._stream_ready.is_set() and self.audio_stream is not None
+                    and self._stream_device_id == device_id and self.audio_stream.active):
+                return
+            self._stream_ready.clear()
             try:
                 if self.audio_stream is not None:
                     try:
@@ -680,18 +858,29 @@ class HellschreiberGUI:
                         pass
                     self.audio_stream = None
 
-                # ブロックサイズを小さくしてレイテンシーを減らす
-                blocksize = SAMPLES_PER_PIXEL
+                # 前のストリームに残っていた再生待ちの波形は捨てる
+                with self._audio_cond:
+                    self._audio_queue.clear()
+                    self._audio_offset = 0
+                    self._queued_samples = 0
+                    self._samples_played = 0
+                    self._audio_cond.notify_all()
+
+                # 波形はコールバックで供給する（送信スレッドは write でブロックしない）
+                import sounddevice as sd
                 self.audio_stream = sd.OutputStream(
                     samplerate=SAMPLE_RATE,
                     device=device_id,
                     channels=1,
-                    blocksize=blocksize,
+                    blocksize=AUDIO_BLOCKSIZE,
                     latency='low',
-                    dtype=np.float32
+                    dtype=np.float32,
+                    callback=self._audio_callback
                 )
                 self.audio_stream.start()
                 self.audio_available = True
+                self._stream_device_id = device_id
+                self._stream_ready.set()
             except Exception as ex:
                 # 音声関連の例外はここでキャッチしてフラグを切る
                 print(f"音声ストリーム初期化エラー: {ex}")
@@ -701,66 +890,55 @@ class HellschreiberGUI:
                 except Exception:
                     pass
                 self.audio_stream = None
+                self._stream_device_id = None
                 self.audio_available = False
                 # 上位で処理するため例外を投げる
                 raise
 
-    def _play_waves(self, waves: List[np.ndarray]) -> None:
-        """波形データのリストを再生する（余分なパディングをせずチャンク単位で書き込む）"""
-        if not waves:
-            return
-
-        if not getattr(self, 'audio_available', True):
-            raise Exception("音声デバイスが利用できません")
-
-        device_id = self.get_selected_device_id()
-        if device_id is None:
-            raise Exception("出力デバイスが選択されていません")
-
-        try:
-            if self.audio_stream is None:
-                self._initialize_audio_stream(device_id)
-            if self.audio_stream is None:
-                raise Exception("音声ストリームの初期化に失敗しました")
-
-            combined_wave = np.concatenate(waves)
-            volume_factor = 10 ** (self.volume_level / 20)
-            adjusted_wave = combined_wave * volume_factor
-
-            # ゼロパディングは行わない。小さなチャンクに分けて順次書き込む。
-            chunk_size = max(1, SAMPLES_PER_PIXEL * 8)
-            with self.stream_lock:
-                for i in range(0, len(adjusted_wave), chunk_size):
-                    chunk = adjusted_wave[i:i + chunk_size]
-                    try:
-                        self.audio_stream.write(chunk)
-                    except Exception as e:
-                        print(f"再生中エラー(write): {e}")
-                        self.audio_available = False
-                        # 再初期化を試みる
-                        try:
-                            self._initialize_audio_stream(device_id)
-                        except Exception:
-                            pass
-                        raise
-
-        except sd.PortAudioError as e:
-            print(f"音声出力エラー: {e}")
-            self.audio_available = False
-            try:
-                self._initialize_audio_stream(device_id)
-            except Exception:
-                pass
-            raise
-        except Exception:
-            # 既にログ出力済みの可能性があるので再送出
-            raise
-
-    def _play_wave(self, wave: np.ndarray) -> None:
-        """1文字分の波形を再生（音量適用、パディングは行わない）"""
-        if wave is None or wave.size == 0:
-            return
-
+    def _audio_callback(self, outdata: np.ndarray, frames: int, time_info, status) -> None:
+        """PortAudio の出力コールバック: キューから frames サンプルを取り出し float32 に変換して書き込む"""
+        out = outdata[:, 0]
+        filled = 0
+        with self._audio_cond:
+            while filled < frames and self._audio_queue:
+                head = self._audio_queue[0]
+                n = min(frames - filled, len(head) - self._audio_offset)
+                # int16 -> float32 の変換と音量はコピーと同時に掛ける
+                # （キューの波形はキャッシュを共有しているので書き換えない）
+                np.multiply(head[self._audio_offset:self._audio_offset + n], self._pcm_gain,
+                            out=out[filled:filled + n], dtype=np.float32)
+                filled += n
+                self._audio_offset += n
+                if self._audio_offset >= len(head):
+                    self._audio_queue.popleft()
+                    self._audio_offset = 0
+            self._queued_samples -= filled
+            self._samples_played += filled
+            self._audio_cond.notify_all()
+        # 送信データが途切れたら無音で埋める
+        if filled < frames:
+            out[filled:] = 0
+
+    def _enqueue_wave(self, wave: np.ndarray) -> None:
+        """波形（send_char と同じ int16 形式）を再生キューに積む（キューが BUFFER_SAMPLES を超える間は空くまで待つ）"""
+        with self._audio_cond:
+            while self._queued_samples > 0 and self._queued_samples + len(wave) > BUFFER_SAMPLES:
+                if self.audio_stream is None or not self.audio_stream.active:
+                    raise Exception("音声ストリームが停止しています")
+                self._audio_cond.wait(0.5)
+            self._audio_queue.append(wave)
+            self._queued_samples += len(wave)
+
+    def _wait_audio_drained(self, timeout: Optional[float] = None) -> bool:
+        """キューに積んだ波形がすべて出力されるまで待つ（ストリーム停止時は待たない）"""
+        with self._audio_cond:
+            return self._audio_cond.wait_for(
+                lambda: self._queued_samples <= 0
+                or self.audio_stream is None or not self.audio_stream.active,
+                timeout)
+
+    def _ensure_audio_stream(self) -> None:
+        """再生前の確認: デバイスとストリームが使える状態にする（使えなければ例外）"""
         if not getattr(self, 'audio_available', True):
             raise Exception("音声デバイスが利用できません")
 
@@ -768,69 +946,129 @@ class HellschreiberGUI:
         if device_id is None:
             raise Exception("出力デバイスが選択されていません")
 
-        # ストリームがなければ初期化
-        if self.audio_stream is None:
+        # ストリームが準備できていなければ初期化
+        if not self._stream_ready.is_set():
             self._initialize_audio_stream(device_id)
-        if self.audio_stream is None:
+        if not self._stream_ready.is_set():
             raise Exception("音声ストリームの初期化に失敗しました")
 
-        volume_factor = 10 ** (self.volume_level / 20)
-        adjusted = wave * volume_factor
-
-        # 余分なゼロ追加はしない。小チャンクで書き込み。
-        chunk_size = max(1, SAMPLES_PER_PIXEL * 8)
-        with self.stream_lock:
-            for i in range(0, len(adjusted), chunk_size):
-                chunk = adjusted[i:i + chunk_size]
-                try:
-                    self.audio_stream.write(chunk)
-                except Exception as e:
-                    print(f"再生中エラー(write): {e}")
-                    self.audio_available = False
-                    # ユーザに通知
-                    messagebox.showerror("エラー", f"再生中にエラーが発生しました: {e}")
-                    raise
+    def _play_waves(self, waves: List[np.ndarray]) -> None:
+        """波形データのリストを1本に連結し、1回だけ再生キューへ積む（余分なパディングはしない）
+        分割はストリームのブロックサイズ単位でコールバックが行う。
+        """
+        waves = [w for w in waves if w is not None and w.size > 0]
+        if not waves:
+            return
+        self._ensure_audio_stream()
+        self._enqueue_wave(self._assemble_message(waves))
+
+    def _update_sent_marker(self, start_sample: int, marked: int, total: int) -> None:
+        """再生位置（出力済みサンプル数）から送信済みの文字数を求めて表示を更新する（GUI スレッドで実行）"""
+        with self._audio_cond:
+            played = self._samples_played - start_sample
+        # 再生が始まった文字までを送信済みにする
+        started = min(total, played // SAMPLES_PER_CHAR + 1) if played >= 0 else 0
+        if started > marked:
+            self.output_display.config(state='normal')
+            try:
+                self.output_display.tag_remove("pending", f"1.{marked}", f"1.{started}")
+                self.output_display.tag_add("sent", f"1.{marked}", f"1.{started}")
+            except tk.TclError:
+                pass
+            self.output_display.config(state='disabled')
+            marked = started
+        # 送信中で未表示の文字が残っていれば、次の更新を予約する
+        if marked < total and self._sending:
+            self.root.after(50, self._update_sent_marker, start_sample, marked, total)
+
+    def _assemble_message(self, waves: List[np.ndarray]) -> np.ndarray:
+        """文字ごとの波形を作業用バッファ上で1本に連結して返す"""
+        total = sum(len(w) for w in waves)
+        with self._audio_cond:
+            # 再生キューが参照しているバッファは上書きしない
+            in_use = {id(w.base) for w in self._audio_queue if w.base is not None}
+        for i in (self._message_buffer_index, self._message_buffer_index ^ 1):
+            if id(self._message_buffers[i]) not in in_use:
+                break
+        else:
+            # 2面とも再生待ち（通常は起きない）なら、この送信だけ別に確保する
+            message_wave = np.empty(total, dtype=np.int16)
+            np.concatenate(waves, out=message_wave)
+            return message_wave
+        if total > len(self._message_buffers[i]):
+            # 足りなければ倍々で広げる（長い文を続けて送っても確保は数回で済む）
+            size = len(self._message_buffers[i])
+            while size < total:
+                size *= 2
+            self._message_buffers[i] = np.empty(size, dtype=np.int16)
+        self._message_buffer_index = i ^ 1
+        message_wave = self._message_buffers[i][:total]
+        if waves:
+            np.concatenate(waves, out=message_wave)
+        return message_wave
+
+    def _show_error_later(self, message: str) -> None:
+        """エラーダイアログを GUI スレッドで表示する（送信スレッドはダイアログを待たずに後始末へ進む）"""
+        self.root.after(0, lambda: messagebox.showerror("エラー", message))
 
     def transmit_text(self, text: str) -> None:
+        self._sending = True
         try:
-            # PTTをON
+            # PTTをON。送信機が立ち上がるまでの LATENCY の間に波形を用意する
             self.ptt.set_ptt(True)
-            time.sleep(LATENCY)
+            ptt_on_at = time.monotonic()
 
-            # 各文字ごとに波形を生成して即時送信、タグ更新は送信前に行う
-            for i, ch in enumerate(text):
+            # 全文字の波形を先に用意し、1本の波形にまとめて一度だけキューに積む
+            try:
+                prepare_chars(text)
+            except Exception as e:
+                print(f"波形の一括生成エラー: {e}")
+            waves = []
+            for ch in text:
                 try:
-                    wave = send_char(ch)
+                    waves.append(send_char(ch))
                 except Exception as e:
                     print(f"send_char エラー: {e}")
-                    wave = np.zeros(SAMPLES_PER_CHAR, dtype=np.float32)
+                    waves.append(_SILENT_CHAR)
 
-                if wave.size > 0:
-                    # タグ更新（送信開始と同時に色を変える）
-                    self.output_display.config(state='normal')
-                    try:
-                        self.output_display.tag_remove("pending", f"1.{i}", f"1.{i+1}")
-                        self.output_display.tag_add("sent", f"1.{i}", f"1.{i+1}")
-                    except tk.TclError:
-                        pass
-                    self.output_display.config(state='disabled')
-                    self.root.update()
+            # 波形の用意にかかった時間を差し引いて、PTT ON から LATENCY 経つまで待つ
+            remaining = LATENCY - (time.monotonic() - ptt_on_at)
+            if remaining > 0:
+                time.sleep(remaining)
 
-                    # 再生。再生エラーはログに出して中断する
-                    try:
-                        self._play_wave(wave)
-                    except Exception as e:
-                        print(f"再生エラー: {e}")
-                        messagebox.showerror("エラー", f"再生中にエラーが発生しました: {e}")
-                        break
+            # 再生。再生エラーはログに出して中断する
+            try:
+                with self._audio_cond:
+                    # この送信の先頭が出力される時点のサンプル位置
+                    start_sample = self._samples_played + self._queued_samples
+                self._play_waves(waves)
+            except Exception as e:
+                print(f"再生エラー: {e}")
+                self._show_error_later(f"再生中にエラーが発生しました: {e}")
+            else:
+                # 送信済み表示は GUI スレッドのタイマーで再生位置に合わせて更新する
+                self.root.after(0, self._update_sent_marker, start_sample, 0, len(text))
 
         except Exception as e:
             print(f"送信エラー: {e}")
-            messagebox.showerror("エラー", f"送信中にエラーが発生しました: {e}")
+            self._show_error_later(f"送信中にエラーが発生しました: {e}")
         finally:
-            time.sleep(LATENCY)
-            self.ptt.set_ptt(False)
-            self.send_button.config(state='normal')
+            # キューに積んだ分を出し切ったら、出力レイテンシー分の後に GUI スレッドで PTT を切る
+            # （送信スレッドは待たずに終了する）
+            self._wait_audio_drained(timeout=len(text) * SAMPLES_PER_CHAR / SAMPLE_RATE + 1.0)
+            self._sending = False
+            try:
+                self.root.after(int(LATENCY * 1000), self._finish_transmission)
+            except (RuntimeError, tk.TclError):
+                # ウィンドウが既に閉じられている場合はその場で PTT を切る
+                self.ptt.set_ptt(False)
+
+    def _finish_transmission(self) -> None:
+        """送信の後始末: PTT を切って送信ボタンを戻す（GUI スレッドで実行）
+        ボタンは PTT を切った後に戻すので、次の送信が前回の PTT OFF と重なることはない。
+        """
+        self.ptt.set_ptt(False)
+        self.send_button.config(state='normal')
             
     def __del__(self):
         """デストラクタ：音声ストリームを確実にクローズ"""
@@ -15,15 +15,34 @@ BDFconv.py — BDF → ヘルシュライバー用グリフ変換ツール
   3) 変換モード（入力/出力はオプションで指定可）
      python BDFconv.py -i k12-2000-1.bdf -o glyphs.py
      デフォルト: 入力 'k12-2000-1.bdf', 出力 'glyphs.py'
+     （文字を限定する: python BDFconv.py -o glyphs.py --chars "ヘルシュライバー"）
+     （バイナリ形式で保存する: python BDFconv.py -o glyphs.npz）
+     （各グリフを1つの整数で保存する: python BDFconv.py -o glyphs.py --packed）
 """
+from functools import lru_cache
 from pathlib import Path
+import re
 import sys
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import argparse
 
+import numpy as np
+
+# 1バイト (0x00..0xFF) -> 8ドット (MSB が左端) の変換テーブル
+_HEX_TO_BITS = np.array([[(b >> k) & 1 for k in range(7, -1, -1)] for b in range(256)], dtype=np.uint8)
+_HEX_TO_BITS.setflags(write=False)
+
+# ビットマップ行（16進数のみからなる行）の判定
+_HEX_ROW_RE = re.compile(rb'[0-9A-Fa-f]+')
+# 改行で連結した1グリフ分のビットマップ行がすべて16進行かどうかの判定
+_HEX_BLOCK_RE = re.compile(rb'[0-9A-Fa-f]+(?:\n[0-9A-Fa-f]+)*')
+
 def parse_bdf_glyph(lines, start_index):
-    """BDFファイルの1文字分のビットマップデータを解析"""
-    bitmap = []
+    """BDFファイルの1文字分のビットマップデータを解析（(12, 8) の uint8 配列を返す）"""
+    # 12行に満たない分や無効な行は 0 のまま残るので、末尾の埋め処理は不要
+    bitmap = np.zeros((12, 8), dtype=np.uint8)
+    # 各行の先頭1バイト（8ドット分）を集め、最後に変換テーブルで (行数, 8) にまとめて展開する
+    row_bytes: List[int] = []
     encoding = None
     i = start_index
 
@@ -41,41 +60,37 @@ def parse_bdf_glyph(lines, start_index):
             for _ in range(12):
                 if i >= len(lines) or lines[i].startswith('ENDCHAR'):
                     break
-                # 16進数文字列を2進数ビットパターンに変換
+                # 16進数文字列を整数に変換し、先頭1バイト（8ドット分）を取り出す
                 hex_str = lines[i].strip()
                 if hex_str:  # 空行チェックを追加
                     try:
-                        bin_str = bin(int(hex_str, 16))[2:].zfill(8)
-                        bitmap.append([1 if bit == '1' else 0 for bit in bin_str])
+                        value = int(hex_str, 16)
+                        row_bytes.append((value >> max(0, len(hex_str) * 4 - 8)) & 0xFF)
                     except ValueError:
-                        print(f"警告: 無効な16進数データ: {hex_str}")
-                        bitmap.append([0] * 8)  # エラー時は空行を追加
+                        print(f"警告: 無効な16進数データ: {hex_str}")  # エラー時は空行のまま
+                        row_bytes.append(0)
                 i += 1
             break
         i += 1
 
-    # ビットマップが12行になるように調整
-    while len(bitmap) < 12:
-        bitmap.append([0] * 8)
-
+    if row_bytes:
+        bitmap[:len(row_bytes)] = _HEX_TO_BITS[row_bytes]
     return encoding, bitmap, i
 
+# convert_to_hell_format 用: 8×12 固定なので、上から行 r を (12 - r) ビット目に置く重みを
+# 定数として持ち、12 行 × 8 列の列パックを1回の内積で済ませる（最大 0x1FFE で uint16 に収まる）
+_HELL_ROW_WEIGHTS = (1 << np.arange(12, 0, -1)).astype(np.uint16)
+_HELL_ROW_WEIGHTS.setflags(write=False)
+
 def convert_to_hell_format(bitmap):
     """8×12ビットマップをヘルシュライバー形式（14×8）に変換"""
-    hell_columns = [0] * 8  # 8列に変更
-
-    # 各列について処理
-    for x in range(8):  # 8列すべてを処理
-        column_bits = 0
-        # 12ビットを14ビットの中央に配置（上下1ビットずつマージン）
-        for y in range(12):  # 12行分のデータ
-            # ビットマップは上から下なので、下から上へと配置するように順序を反転
-            if bitmap[11 - y][x]:  # インデックスを反転
-                column_bits |= (1 << (y + 1))  # 1ビット目をマージンとして空ける
-        hell_columns[x] = column_bits
-
-    return hell_columns
+    # 12ビットを14ビットの中央に配置（上下1ビットずつマージン）
+    # ビットマップは上から下なので、下の行ほど下位ビットに詰める
+    bits = np.asarray(bitmap, dtype=np.uint16)[:12, :8] & 1
+    return (_HELL_ROW_WEIGHTS[:len(bits)] @ bits).tolist()
 
+# 同じ ENCODING 値は --chars の候補探索と変換の両方で引かれるので、結果を覚えておく（入力は整数のみ）
+@lru_cache(maxsize=65536)
 def _decode_jis_encoding_to_char(encoding):
     """
     JIS 形式の数値エンコーディング（例: 0x2121）を Unicode 文字に変換する。
@@ -125,40 +140,78 @@ def _decode_jis_encoding_to_char(encoding):
 
     return None
 
-def parse_bdf(path: Path) -> Dict[int, List[str]]:
-    """BDF を読み、各グリフの ENCODING -> bitmap hex lines を返す"""
+def _encode_char_to_jis(ch: str) -> List[int]:
+    """
+    _decode_jis_encoding_to_char の逆変換。文字 ch になり得る BDF の ENCODING 値の候補を返す。
+    1バイト値 / EUC-JP 由来の JIS / Shift_JIS / Unicode codepoint のうち、
+    _decode_jis_encoding_to_char で ch に戻るものをすべて返す（例: '´' は 0xB4 と 0x212D）。
+    """
+    o = ord(ch)
+    candidates: List[int] = []
+    if o <= 0xFF:
+        candidates.append(o)
+    for codec, mask in (('euc_jp', 0x7F), ('shift_jis', 0xFF)):
+        try:
+            b = ch.encode(codec)
+        except UnicodeEncodeError:
+            continue
+        if len(b) == 2:
+            candidates.append(((b[0] & mask) << 8) | (b[1] & mask))
+    candidates.append(o)
+    return [code for code in dict.fromkeys(candidates) if _decode_jis_encoding_to_char(code) == ch]
+
+def _hex_rows_to_str(rows: List[bytes]) -> List[str]:
+    """1グリフ分のビットマップ行（bytes）から16進行だけを取り出して文字列のリストにする"""
+    # 通常はすべて16進行なので、連結して1回の判定・1回のデコードで済ませる
+    joined = b"\n".join(rows)
+    if _HEX_BLOCK_RE.fullmatch(joined):
+        return joined.decode("ascii").split("\n")
+    # 16進でない行（空行など）が混じっているときだけ1行ずつ判定して読み飛ばす
+    return [row.decode("ascii") for row in rows if _HEX_ROW_RE.fullmatch(row)]
+
+def parse_bdf(path: Path, wanted: Optional[Dict[int, str]] = None) -> Dict[int, List[str]]:
+    """
+    BDF を読み、各グリフの ENCODING -> bitmap hex lines を返す。
+    wanted（ENCODING -> 文字）を指定した場合はその ENCODING のグリフだけを集め、
+    すべての文字が揃った時点で以降の行は読まずに打ち切る。
+    """
     glyphs = {}
-    current_encoding: Optional[int] = None
-    bitmap_lines: List[str] = []
-    in_bitmap = False
-    with path.open("r", encoding="utf-8", errors="ignore") as f:
-        for raw in f:
-            line = raw.rstrip("\n")
-            if line.startswith("STARTCHAR"):
-                current_encoding = None
-                bitmap_lines = []
-                in_bitmap = False
-            elif line.startswith("ENCODING"):
-                parts = line.split()
-                if len(parts) >= 2:
-                    try:
-                        current_encoding = int(parts[1])
-                    except Exception:
-                        current_encoding = None
-            elif line == "BITMAP":
-                in_bitmap = True
-            elif line == "ENDCHAR":
-                if current_encoding is not None and bitmap_lines:
-                    if current_encoding >= 0:
-                        glyphs[current_encoding] = bitmap_lines.copy()
-                current_encoding = None
-                bitmap_lines = []
-                in_bitmap = False
-            else:
-                if in_bitmap:
-                    s = line.strip()
-                    if s and all(c in "0123456789ABCDEFabcdef" for c in s):
-                        bitmap_lines.append(s)
+    remaining = set(wanted.values()) if wanted is not None else None
+    if remaining is not None and not remaining:
+        return glyphs
+    # BDF の必要な部分は ASCII のみなので、ファイル全体をバイト列のまま1回で読み、
+    # STARTCHAR でグリフごとに分割してから各キーワードを bytes.find で探す
+    # （行ごとの strip やキーワード判定を Python で繰り返さない）
+    data = path.read_bytes()
+    for chunk in data.split(b"\nSTARTCHAR")[1:]:
+        enc_pos = chunk.find(b"\nENCODING")
+        if enc_pos < 0:
+            continue
+        enc_end = chunk.find(b"\n", enc_pos + 1)
+        parts = chunk[enc_pos + len(b"\nENCODING"):enc_end if enc_end >= 0 else len(chunk)].split()
+        try:
+            code = int(parts[0])
+        except Exception:
+            continue
+        # 不要なグリフはビットマップ行を取り出さない
+        if code < 0 or (wanted is not None and code not in wanted):
+            continue
+        bitmap_pos = chunk.find(b"\nBITMAP", enc_pos)
+        if bitmap_pos < 0:
+            continue
+        rows_start = chunk.find(b"\n", bitmap_pos + 1) + 1
+        rows_end = chunk.find(b"\nENDCHAR", bitmap_pos)
+        if rows_start <= 0 or rows_end < 0:
+            continue
+        # 空白区切りで分割すると各行の前後の空白（CRLF の \r を含む）も落ちる
+        bitmap_lines = chunk[rows_start:rows_end].split()
+        hex_lines = _hex_rows_to_str(bitmap_lines) if bitmap_lines else []
+        if hex_lines:
+            glyphs[code] = hex_lines
+            if remaining is not None:
+                remaining.discard(wanted[code])
+                if not remaining:
+                    break
     return glyphs
 
 def hexrow_to_bits(hexstr: str, width: int) -> List[int]:
@@ -167,11 +220,11 @@ def hexrow_to_bits(hexstr: str, width: int) -> List[int]:
         val = int(hexstr, 16)
     except Exception:
         val = 0
-    bits: List[int] = []
-    for i in range(width):
-        shift = (width - 1 - i)
-        bits.append((val >> shift) & 1)
-    return bits
+    # 下位 width ビットをバイト単位でテーブル展開し、左側の余りビットを落とす
+    n_bytes = (width + 7) // 8
+    val &= (1 << width) - 1
+    bits = _HEX_TO_BITS[list(val.to_bytes(n_bytes, 'big'))].ravel()
+    return bits[n_bytes * 8 - width:].tolist()
 
 def infer_bdf_width_from_hex(hexstr: str) -> int:
     """hex 表記から幅を推測（hex桁 * 4）。BDF の行は通常行ごとに同じ幅."""
@@ -186,7 +239,7 @@ def build_14x14_from_12x12(bitmap_lines: List[str], expected_w: int = 12, expect
     rows = 14
     cols = 14
     # マトリクス初期化
-    mat = [[0 for _ in range(cols)] for _ in range(rows)]
+    mat = np.zeros((rows, cols), dtype=np.uint16)
     # 12x12 を (1,1) に置く
     row_offset = 1
     col_offset = 1
@@ -200,26 +253,45 @@ def build_14x14_from_12x12(bitmap_lines: List[str], expected_w: int = 12, expect
             bdf_width = expected_w
 
     # BDF 行数が expected_h でない場合も、上寄せで配置する（行 0 -> row_offset）
+    # BDF のビット列は左が MSB -> canvas の左から配置（列が 12 を超える場合は切り捨て）
+    width = min(bdf_width, expected_w)
     for r_idx, hexrow in enumerate(bitmap_lines[:expected_h]):
-        bits = hexrow_to_bits(hexrow, bdf_width)
-        # BDF のビット列は左が MSB -> canvas の左から配置
-        for c_idx in range(min(bdf_width, expected_w)):
-            # 列が 12 を超える場合は切り捨て
-            mat[row_offset + r_idx][col_offset + c_idx] = bits[c_idx]
-
-    # ここで垂直方向の向きを修正する。グリフではフォントの下が上になるため
-    # mat を上下反転してからビットパックすることで表示の上下逆転を解消する。
-    mat = list(reversed(mat))
-
-    # 列ごとに整数化（bit 0 = top）
-    cols_ints: List[int] = []
-    for c in range(cols):
-        v = 0
-        for y in range(rows):
-            if mat[y][c]:
-                v |= (1 << y)
-        cols_ints.append(v)
-    return cols_ints
+        mat[row_offset + r_idx, col_offset:col_offset + width] = hexrow_to_bits(hexrow, bdf_width)[:width]
+
+    # グリフではフォントの下が上になるため、上下反転してからビットパックする
+    # （上から行 y を (rows - 1 - y) ビット目に置く重みとの内積で、列ごとの整数を一度に求める）
+    weights = (1 << np.arange(rows - 1, -1, -1)).astype(np.uint16)
+    return (weights @ mat).tolist()
+
+def build_hell_columns_batch(bitmaps: List[List[str]], expected_w: int = 12, expected_h: int = 12) -> np.ndarray:
+    """
+    複数グリフの bitmap hex lines をまとめて 14x14 の列データに変換する。
+    戻り値は (N, 14) の uint16 配列で、各行は build_14x14_from_12x12 の結果と同じ。
+    行の桁数が揃っているグリフは桁数ごとに 1 回の unpackbits でまとめて処理し、
+    桁数が不揃いなグリフだけ build_14x14_from_12x12 で個別に変換する。
+    """
+    out = np.zeros((len(bitmaps), 14), dtype=np.uint16)
+    groups: Dict[int, List[int]] = {}
+    for idx, lines in enumerate(bitmaps):
+        if not lines:
+            continue
+        n_hex = len(lines[0])
+        if all(len(h) == n_hex for h in lines[:expected_h]):
+            groups.setdefault(n_hex, []).append(idx)
+        else:
+            out[idx] = build_14x14_from_12x12(lines, expected_w=expected_w, expected_h=expected_h)
+
+    # 行 r（上から）を (12 - r) ビット目に置く: 上下反転 + 上下1ビットのマージン
+    shifts = np.arange(12, 12 - expected_h, -1, dtype=np.uint16)[None, :, None]
+    for n_hex, idxs in groups.items():
+        pad = ['0' * n_hex] * expected_h
+        joined = ''.join(''.join((bitmaps[idx][:expected_h] + pad)[:expected_h]) for idx in idxs)
+        raw = np.frombuffer(bytes.fromhex(joined), dtype=np.uint8)
+        # BDF のビット列は左が MSB。幅が 12 を超える分は切り捨てる
+        bits = np.unpackbits(raw).reshape(len(idxs), expected_h, n_hex * 4)[:, :, :expected_w]
+        cols = (bits.astype(np.uint16) << shifts).sum(axis=1, dtype=np.uint16)
+        out[idxs, 1:1 + cols.shape[1]] = cols
+    return out
 
 def _is_japanese_char(s: Optional[str]) -> bool:
     """文字列に日本語（ひらがな・カタカナ・CJK統合漢字など）が含まれるか簡易判定"""
@@ -231,124 +303,219 @@ def _is_japanese_char(s: Optional[str]) -> bool:
             return True
     return False
 
-def convert_bdf_to_hell(bdf_file):
-    """BDFファイルをヘルシュライバーグリフ辞書に変換"""
-    bdf_path = Path(bdf_file)
-    bdf_glyphs = parse_bdf(bdf_path)
-    out_map = {}
-    for code, rows in bdf_glyphs.items():
-        cols = build_14x14_from_12x12(rows, expected_w=12, expected_h=12)
-        out_map[code] = cols
-
-    # encoding -> Unicode 変換: JIS形式のエンコーディングを想定するBDFもあるため
-    # 既存の _decode_jis_encoding_to_char を活用し、判定が怪しいときは chr() にフォールバックする
-    final_map = {}
-    for code, cols in out_map.items():
-        if code is None:
-            continue
-        ch = None
-        try:
-            if code <= 0xFF:
-                ch = chr(code)
+@lru_cache(maxsize=65536)
+def _encoding_to_glyph_key(code: int) -> str:
+    """
+    BDF の ENCODING 値を GLYPHS のキー（1文字）にする。
+    JIS形式のエンコーディングを想定するBDFもあるため、既存の _decode_jis_encoding_to_char を活用し、
+    判定が怪しいときは chr() にフォールバックする。どれも失敗したら U+XXXX 形式の文字列を返す。
+    """
+    ch = None
+    try:
+        if code <= 0xFF:
+            ch = chr(code)
+        else:
+            # まず JIS/SHIFT_JIS 等を試す
+            try:
+                dec = _decode_jis_encoding_to_char(code)
+            except Exception:
+                dec = None
+            # dec が有効な単一文字なら採用
+            if dec and isinstance(dec, str) and len(dec) >= 1:
+                # 複数文字になってしまった場合は先頭文字を考慮する（必要なら振り分けロジックを拡張）
+                ch = dec[0]
             else:
-                # まず JIS/SHIFT_JIS 等を試す
+                # フォールバック: code を Unicode コードポイントとして解釈
                 try:
-                    dec = _decode_jis_encoding_to_char(code)
+                    ch = chr(code)
                 except Exception:
-                    dec = None
-                # dec が有効な単一文字なら採用
-                if dec and isinstance(dec, str) and len(dec) >= 1:
-                    # 複数文字になってしまった場合は先頭文字を考慮する（必要なら振り分けロジックを拡張）
-                    ch = dec[0]
-                else:
-                    # フォールバック: code を Unicode コードポイントとして解釈
-                    try:
-                        ch = chr(code)
-                    except Exception:
-                        ch = None
-        except Exception:
-            ch = None
+                    ch = None
+    except Exception:
+        ch = None
+    if ch is None:
+        # 最終手段として、キーに U+XXXX 形式の文字列を使って保存（ファイル化やデバッグ用）
+        return f"U+{code:04X}"
+    return ch
 
-        if ch is not None:
-            final_map[ch] = cols
-        else:
-            # 最終手段として、キーに U+XXXX 形式の文字列を使って保存（ファイル化やデバッグ用）
-            final_map[f"U+{code:04X}"] = cols
-    return final_map
-
-def save_hell_glyphs(glyphs, output_file):
-    """グリフデータをPythonファイルとして保存"""
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write('# ヘルシュライバー用グリフデータ\n')
-        f.write('GLYPHS = {\n')
-        for char, data in sorted(glyphs.items()):
-            # repr を使って適切にエスケープ（char が Unicode であれば UTF-8 で正しく保存される）
-            char_repr = repr(char)
-            f.write(f'    {char_repr}: {data},\n')
-        f.write('}\n')
+def convert_bdf_to_hell(bdf_file, wanted: Optional[Iterable[str]] = None):
+    """
+    BDFファイルをヘルシュライバーグリフ辞書に変換
+    wanted（文字の列）を指定するとその文字だけを変換し、揃った時点で BDF の読み込みを終える。
+    """
+    bdf_path = Path(bdf_file)
+    wanted_codes = None
+    if wanted is not None:
+        wanted_codes = {code: ch for ch in set(wanted) for code in _encode_char_to_jis(ch)}
+    bdf_glyphs = parse_bdf(bdf_path, wanted_codes)
+    # 全グリフを (N, 14) の配列として一括変換する
+    cols_arr = build_hell_columns_batch(list(bdf_glyphs.values()), expected_w=12, expected_h=12)
+    # encoding -> Unicode 変換（キーの決め方は _encoding_to_glyph_key を参照）
+    return {_encoding_to_glyph_key(code): cols for code, cols in zip(bdf_glyphs.keys(), cols_arr.tolist())}
+
+# pack_glyph_columns: 1列あたりのビット幅（14ビットの列データを16ビット境界に置く）
+_PACKED_COLUMN_BITS = 16
+
+def pack_glyph_columns(cols) -> int:
+    """列リストを1つの整数にまとめる（列 x を 16*x ビット目から配置）"""
+    packed = 0
+    for x, col in enumerate(cols):
+        packed |= (int(col) & 0xFFFF) << (_PACKED_COLUMN_BITS * x)
+    return packed
+
+def unpack_glyph_columns(packed: int, width: int = 14) -> List[int]:
+    """pack_glyph_columns の逆変換（width 列のリストに戻す）"""
+    return [(packed >> (_PACKED_COLUMN_BITS * x)) & 0xFFFF for x in range(width)]
+
+def save_hell_glyphs(glyphs, output_file, packed: bool = False):
+    """
+    グリフデータをPythonファイルとして保存（全体を1つの文字列にまとめて1回で書き込む）
+    packed=True の場合は各グリフを列リストではなく pack_glyph_columns の整数（16進）で書き出す。
+    """
+    parts = ['# ヘルシュライバー用グリフデータ\n', 'GLYPHS = {\n']
+    # 並び順は codepoint 順（文字列比較ではなく整数配列の argsort で決める）
+    keys = list(glyphs)
+    codes = np.fromiter((_glyph_key_to_code(k) for k in keys), dtype=np.int64, count=len(keys))
+    order = np.argsort(codes, kind='stable').tolist()
+    # repr を使って適切にエスケープ（char が Unicode であれば UTF-8 で正しく保存される）
+    if packed:
+        parts.extend(f'    {keys[i]!r}: {pack_glyph_columns(glyphs[keys[i]]):#x},\n' for i in order)
+    else:
+        parts.extend(f'    {keys[i]!r}: {glyphs[keys[i]]},\n' for i in order)
+    parts.append('}\n')
+    # 1回だけ UTF-8 にエンコードしてバイナリで書き込む（テキスト層の変換を通さない。改行は常に LF）
+    with open(output_file, 'wb') as f:
+        f.write(''.join(parts).encode('utf-8'))
+
+def _glyph_key_to_code(key: str) -> int:
+    """グリフ辞書のキー（1文字 または 'U+XXXX'）を codepoint に変換"""
+    if len(key) == 1:
+        return ord(key)
+    return int(key[2:], 16)
+
+def _code_to_glyph_key(code: int) -> str:
+    """_glyph_key_to_code の逆変換"""
+    try:
+        return chr(code)
+    except (ValueError, OverflowError):
+        return f"U+{code:04X}"
+
+def glyphs_to_table(glyphs) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    グリフ辞書を SoA 形式の表に変換する（codepoint 順）
+      codes: (N,) uint32 の codepoint
+      cols:  (N, 列数) uint16 の列データ（列数が足りないグリフは 0 で埋める）
+    """
+    # 並び順は save_hell_glyphs と同じく codepoint の整数順（キー文字列の比較では 'U+XXXX' の位置がずれる）
+    keys = list(glyphs)
+    codes = np.fromiter((_glyph_key_to_code(k) for k in keys), dtype=np.uint32, count=len(keys))
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    keys = [keys[i] for i in order.tolist()]
+    width = max((len(glyphs[k]) for k in keys), default=14)
+    cols = np.zeros((len(keys), width), dtype=np.uint16)
+    for i, k in enumerate(keys):
+        cols[i, :len(glyphs[k])] = glyphs[k]
+    return codes, cols
+
+def table_to_glyphs(codes: np.ndarray, cols: np.ndarray) -> Dict[str, List[int]]:
+    """glyphs_to_table の逆変換（GLYPHS と同じ形の辞書を返す）"""
+    return {_code_to_glyph_key(code): row for code, row in zip(codes.tolist(), cols.tolist())}
+
+def glyph_table_index(codes: np.ndarray) -> Dict[int, int]:
+    """codepoint -> 表の行番号 の索引を作る"""
+    return {code: i for i, code in enumerate(codes.tolist())}
+
+def save_hell_glyphs_bin(glyphs, output_file):
+    """
+    グリフデータをバイナリ（NumPy の .npz。中身は glyphs_to_table の codes / cols）として保存
+    Python ソースとして import し直すより読み込みが速く、ファイルも小さい。
+    """
+    codes, cols = glyphs_to_table(glyphs)
+    with open(output_file, 'wb') as f:
+        np.savez_compressed(f, codes=codes, cols=cols)
+
+def load_hell_glyphs_table(glyph_file) -> Tuple[np.ndarray, np.ndarray]:
+    """save_hell_glyphs_bin で保存した .npz を (codes, cols) の表として読み込む"""
+    with np.load(glyph_file) as data:
+        return data['codes'], data['cols']
+
+def load_hell_glyphs_bin(glyph_file) -> Dict[str, List[int]]:
+    """save_hell_glyphs_bin で保存した .npz を読み込み、GLYPHS と同じ形の辞書を返す"""
+    return table_to_glyphs(*load_hell_glyphs_table(glyph_file))
+
+# print_glyph_bitmap 用: ビット 0/1 -> 表示文字
+_BITMAP_CHARS = np.array(['□', '■'])
 
 def print_glyph_bitmap(glyph_data, rows: int = 14):
     """ヘルシュライバーグリフデータをビットマップとして表示（任意列数 × 指定行数）"""
-    # glyph_data は列リスト（各列が整数ビットマップ）と想定
-    if not isinstance(glyph_data, (list, tuple)) or len(glyph_data) == 0:
+    # glyph_data は列リスト、または表 (cols) の1行（各列が整数ビットマップ）と想定
+    if not isinstance(glyph_data, (list, tuple, np.ndarray)) or len(glyph_data) == 0:
         print("グリフデータが不正です")
         return
 
-    cols = len(glyph_data)
+    col_words = np.asarray(glyph_data, dtype=np.int64)
+    cols = len(col_words)
 
     # カラムインデックス表示（上段：10の位、下段：1の位）— 幅が大きくても見やすく
-    tens = []
-    units = []
-    for idx in range(cols):
-        tens.append(str((idx // 10) % 10) if cols > 10 else ' ')
-        units.append(str(idx % 10))
-    print("   " + ''.join(tens))
-    print("   " + ''.join(units))
-    # ビットマップ行を表示（行0を上に）
-    for y in range(rows):
-        row = []
-        for x in range(cols):
-            bit = (glyph_data[x] >> y) & 1
-            row.append('■' if bit else '□')
-        print(f"{y:2d} " + ''.join(row))
+    tens = ''.join(str((idx // 10) % 10) if cols > 10 else ' ' for idx in range(cols))
+    units = ''.join(str(idx % 10) for idx in range(cols))
+    out_lines = ["   " + tens, "   " + units]
+    # ビットマップ行（行0を上に）: (rows, cols) のビット行列を一度に作り表示文字に置き換える
+    bits = (col_words[None, :] >> np.arange(rows)[:, None]) & 1
+    out_lines.extend(f"{y:2d} " + ''.join(row) for y, row in enumerate(_BITMAP_CHARS[bits].tolist()))
+    # 見出しと全行を1つの文字列にまとめて1回で書き出す
+    sys.stdout.write('\n'.join(out_lines) + '\n')
 
 def load_and_show_glyphs(glyph_file, rows: int = 14):
-    """グリフファイルを読み込んで表示（行数を指定可能）"""
+    """グリフファイル（glyphs.py または .npz）を読み込んで表示（行数を指定可能）"""
     try:
-        # グリフファイルをインポート
-        import importlib.util
-        spec = importlib.util.spec_from_file_location("glyphs", glyph_file)
-        glyphs_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(glyphs_module)
+        if Path(glyph_file).suffix.lower() == '.npz':
+            # .npz は表のまま保持し、codepoint -> 行番号 の索引で引く
+            codes, cols = load_hell_glyphs_table(glyph_file)
+            index = glyph_table_index(codes)
+            glyphs = {_code_to_glyph_key(code): cols[i] for code, i in index.items()}
+        else:
+            # グリフファイルをインポート
+            import importlib.util
+            spec = importlib.util.spec_from_file_location("glyphs", glyph_file)
+            glyphs_module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(glyphs_module)
+            glyphs = glyphs_module.GLYPHS
+            # --packed で保存したファイルは整数を列リストに戻して表示する
+            glyphs = {k: unpack_glyph_columns(v) if isinstance(v, int) else v for k, v in glyphs.items()}
 
         while True:
             char = input("表示する文字を入力（終了は空行）: ")
             if not char:
                 break
-            if char in glyphs_module.GLYPHS:
+            if char in glyphs:
                 print(f"\n文字 '{char}' のビットマップ:")
-                print_glyph_bitmap(glyphs_module.GLYPHS[char], rows=rows)
+                print_glyph_bitmap(glyphs[char], rows=rows)
             else:
                 # 見つからない場合は候補の一部を表示してデバッグしやすくする
                 print(f"文字 '{char}' は定義されていません")
-                print("定義済みの先頭キーの例:", list(glyphs_module.GLYPHS.keys())[:20])
+                print("定義済みの先頭キーの例:", list(glyphs.keys())[:20])
     except Exception as e:
         print(f"エラー: グリフファイルの読み込みに失敗しました: {e}")
 
 def main(argv: Optional[List[str]] = None) -> None:
     """コマンドラインインターフェイス:
        -i/--input 入力BDFファイル（デフォルト k12-2000-1.bdf）
-       -o/--output 出力glyphs.py（デフォルト glyphs.py）
+       -o/--output 出力glyphs.py（デフォルト glyphs.py）。拡張子が .npz ならバイナリ形式で保存
        --show 表示モード（生成済み glyphs.py を表示）、表示時は -o を指定して読み込む
        --rows 表示行数（デフォルト 14）
+       --chars 変換する文字を限定（指定した文字が揃った時点で BDF の読み込みを終了）
+       --packed .py 出力で各グリフを1つの整数（16ビット×列）として保存
     """
     if argv is None:
         argv = sys.argv[1:]
     parser = argparse.ArgumentParser(description="BDF -> Hell glyphs converter")
     parser.add_argument('-i', '--input', default='k12-2000-1.bdf', help='入力 BDF ファイルパス (default: k12-2000-1.bdf)')
-    parser.add_argument('-o', '--output', default='glyphs.py', help='出力 Python ファイルパス (default: glyphs.py)')
+    parser.add_argument('-o', '--output', default='glyphs.py', help='出力ファイルパス。.py または .npz (default: glyphs.py)')
     parser.add_argument('--show', action='store_true', help='表示モード: 出力ファイルを読み込み対話表示する')
     parser.add_argument('--rows', type=int, default=14, help='表示モードの行数 (default: 14)')
+    parser.add_argument('--packed', action='store_true', help='.py 出力で各グリフを1つの整数にまとめて保存する')
+    parser.add_argument('--chars', default=None, help='変換する文字を限定する（例: --chars "あいう漢字"）')
     args = parser.parse_args(argv)
 
     input_path = Path(args.input)
@@ -368,11 +535,14 @@ def main(argv: Optional[List[str]] = None) -> None:
         sys.exit(1)
 
     try:
-        glyphs = convert_bdf_to_hell(str(input_path))
+        glyphs = convert_bdf_to_hell(str(input_path), wanted=args.chars)
         if not glyphs:
             print("変換結果が空です。", file=sys.stderr)
             sys.exit(2)
-        save_hell_glyphs(glyphs, str(output_path))
+        if output_path.suffix.lower() == '.npz':
+            save_hell_glyphs_bin(glyphs, str(output_path))
+        else:
+            save_hell_glyphs(glyphs, str(output_path), packed=args.packed)
         print(f"Wrote {output_path} ({len(glyphs)} glyphs)")
     except Exception as e:
         print(f"エラー: {e}", file=sys.stderr)
@@ -16,30 +16,43 @@ import re
 import argparse
 import ast
 import glob
-from typing import List
-
-HEX_RE = re.compile(r'0x[0-9A-Fa-f]+')
-DEC_RE = re.compile(r'\b\d+\b')
-
-def extract_numbers_from_text(text: str) -> List[int]:
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# 入力ファイルで意味のある部分は ASCII だけなので、正規表現は bytes のまま適用する
+# （テキストとしてデコードせずに済む。\d も ASCII の数字だけに一致する）
+HEX_RE = re.compile(rb'0x[0-9A-Fa-f]+')
+DEC_RE = re.compile(rb'\b\d+\b')
+# C の初期化子ブロック { ... } の中身
+BLOCK_RE = re.compile(rb'\{([^}]*)\}')
+# Python ファイル中の典型的な配列変数名と、その list リテラルを探す正規表現
+PY_DATA_NAMES = ['FONT_DATA', 'FELD_DATA', 'font_data', 'FELD_FONT_DATA', 'GLYPH_DATA']
+PY_DATA_RES = [re.compile(rb'%s\s*=\s*(\[[^\]]+\])' % name.encode('ascii'), flags=re.S)
+               for name in PY_DATA_NAMES]
+
+def extract_numbers_from_text(text: bytes, pos: int = 0, endpos: Optional[int] = None) -> List[int]:
+    # text[pos:endpos] の範囲を対象にする（部分文字列を切り出さずに検索する）
+    if endpos is None:
+        endpos = len(text)
     # まず hex を全部抽出
-    nums = [int(m.group(0), 16) for m in HEX_RE.finditer(text)]
+    nums = [int(m.group(0), 16) for m in HEX_RE.finditer(text, pos, endpos)]
     if nums:
         return nums
     # hex が無ければ decimal を抽出（フォールバック）
-    nums = [int(m.group(0)) for m in DEC_RE.finditer(text)]
+    nums = [int(m.group(0)) for m in DEC_RE.finditer(text, pos, endpos)]
     return nums
 
 def try_import_python_data(path: Path) -> List[int]:
     # Python ファイルに配列変数がある場合の簡易抽出: list リテラルの数字を検索
-    text = path.read_text(encoding='utf-8', errors='ignore')
+    text = path.read_bytes()
     # 典型的な変数名を探す
-    candidates = ['FONT_DATA', 'FELD_DATA', 'font_data', 'FELD_FONT_DATA', 'GLYPH_DATA']
-    for name in candidates:
-        m = re.search(rf'{name}\s*=\s*(\[[^\]]+\])', text, flags=re.S)
+    for pattern in PY_DATA_RES:
+        m = pattern.search(text)
         if m:
             try:
-                arr = ast.literal_eval(m.group(1))
+                # 評価する list リテラルの部分だけを文字列にする
+                arr = ast.literal_eval(m.group(1).decode('utf-8', errors='ignore'))
                 return [int(x) for x in arr]
             except Exception:
                 pass
@@ -47,28 +60,41 @@ def try_import_python_data(path: Path) -> List[int]:
     return extract_numbers_from_text(text)
 
 def parse_cxx_file(path: Path) -> List[int]:
-    text = path.read_text(encoding='utf-8', errors='ignore')
+    return parse_cxx_file_with_width(path)[0]
+
+def parse_cxx_file_with_width(path: Path) -> Tuple[List[int], Optional[int]]:
+    """
+    parse_cxx_file と同じ数値列に加えて、行データのビット幅（16 進リテラルの桁数 x 4）を返す。
+    幅を返すのは初期化子ブロック内の 16 進リテラルが全て同じ桁数のときだけで、
+    桁数が揃っていない（ゼロ埋めされていない）場合やブロック外から拾った場合は None（各行から推定させる）。
+    """
+    text = path.read_bytes()
     nums: List[int] = []
-    # 全ての初期化子ブロックを抽出して順に処理する
-    blocks = re.findall(r'\{([^}]*)\}', text, flags=re.S)
-    if blocks:
-        for block in blocks:
-            found = extract_numbers_from_text(block)
-            if found:
-                nums.extend(found)
-    # ブロックが見つからなかった場合や追加不足ならファイル全体から抽出
+    # ブロック内の 16 進リテラルの桁数（0x を除く）
+    digits = set()
+    # 全ての初期化子ブロックを順に処理する（ブロックの範囲をそのまま検索し、切り出さない）
+    for m in BLOCK_RE.finditer(text):
+        found = extract_numbers_from_text(text, m.start(1), m.end(1))
+        if found:
+            nums.extend(found)
+            digits.update(len(h) - 2 for h in HEX_RE.findall(text, m.start(1), m.end(1)))
+    width = digits.pop() * 4 if len(digits) == 1 else None
+    # ブロックが見つからなかった場合や追加不足ならファイル全体から抽出（幅は推定に任せる）
     if not nums:
         nums = extract_numbers_from_text(text)
-    return nums
+        width = None
+    return nums, width
 
 def chunkify(nums: List[int], size: int) -> List[List[int]]:
     return [nums[i:i+size] for i in range(0, len(nums), size)]
 
-def normalize_glyph_rows(glyph_rows: List[int], cols: int = 14, rows: int = 14) -> List[int]:
+def normalize_glyph_rows(glyph_rows: List[int], cols: int = 14, rows: int = 14,
+                         effective_width: Optional[int] = None) -> List[int]:
     """
     行ベースのデータ (長さ rows) -> 列ベースのデータ (長さ cols) に変換。
     入力: glyph_rows[r] は各行のビットパターン（横走査）。
     出力: cols 個の整数。各整数はその列の下->上ビット列（bit0 = 下端）。
+    effective_width: 行データのビット幅（入力形式から分かっていれば指定する。None なら各行から推定）。
     """
     # 行数が不足している場合は下側をゼロで埋める（上寄せ）
     rlist = list(glyph_rows)
@@ -77,32 +103,20 @@ def normalize_glyph_rows(glyph_rows: List[int], cols: int = 14, rows: int = 14)
     else:
         rlist = rlist[:rows]
 
-    # 行ごとの有効幅（最も高いビット位置）を推定
-    max_bitlen = 0
-    for v in rlist:
-        if v:
-            max_bitlen = max(max_bitlen, v.bit_length())
+    if effective_width is None:
+        # 行ごとの有効幅（最も高いビット位置）を推定
+        effective_width = max((v.bit_length() for v in rlist if v), default=0)
     # 最低でも cols として扱う（古いデータでは16bitで左寄せされていることがある）
-    effective_width = max(max_bitlen, cols)
-
-    cols_out: List[int] = []
-    # 左から右へ col_index が進む。左most は effective_width-1 に対応すると仮定
-    for col_index in range(cols):
-        col_val = 0
-        # bit position in source row word (左most -> high bit)
-        src_bitpos = effective_width - 1 - col_index
-        for row_index in range(rows):
-            row_word = rlist[row_index]
-            # row_index: 0 = top, rows-1 = bottom
-            bit = 0
-            if src_bitpos >= 0:
-                bit = (row_word >> src_bitpos) & 1
-            # 出力は下->上を bit0..bit(rows-1) に詰めるので位置は (rows-1 - row_index)
-            if bit:
-                out_bitpos = (rows - 1 - row_index)
-                col_val |= (1 << out_bitpos)
-        cols_out.append(col_val)
-    return cols_out
+    effective_width = max(effective_width, cols)
+
+    # 各行の左端（MSB 側）から cols ビットを切り出す（rows / cols は 64 以下）
+    low = effective_width - cols
+    words = np.array([(v >> low) & ((1 << cols) - 1) for v in rlist], dtype=np.uint64)
+    # (rows, cols) のビット行列: 列 0 = 左端、行 0 = 上
+    bits = (words[:, None] >> np.arange(cols - 1, -1, -1, dtype=np.uint64)) & np.uint64(1)
+    # 出力は下->上を bit0..bit(rows-1) に詰めるので、行 r の重みは 1 << (rows-1 - r)
+    weights = np.left_shift(np.uint64(1), np.arange(rows - 1, -1, -1, dtype=np.uint64))
+    return (weights @ bits).tolist()
 
 def normalize_glyph(glyph: List[int], cols: int = 14) -> List[int]:
     g = list(glyph)
@@ -138,14 +152,19 @@ def main():
         return
 
     nums: List[int] = []
+    # .cxx の 16 進リテラルの桁数から分かる行の幅（ファイル間で揃っている場合だけ使う）
+    widths = set()
     # Collect raw numeric stream across files (we will chunk into rows of 14)
     for f in files:
         if f.suffix.lower() == '.py':
             part = try_import_python_data(f)
+            width = None
         else:
-            part = parse_cxx_file(f)
+            part, width = parse_cxx_file_with_width(f)
         if part:
             nums.extend(part)
+            widths.add(width)
+    row_width = widths.pop() if len(widths) == 1 else None
 
     if not nums:
         print('数値データが抽出できませんでした。入力フォーマットを確認してください。')
@@ -174,14 +193,15 @@ def main():
             ch = f'U+{code:04X}'
         key = repr(ch)
         # 行ベース -> 列ベースに変換（下->上ビット詰め）
-        cols_vals = normalize_glyph_rows(rows, cols=args.cols, rows=args.cols)
+        cols_vals = normalize_glyph_rows(rows, cols=args.cols, rows=args.cols, effective_width=row_width)
         vals = ', '.join(f'0x{v:04X}' for v in cols_vals)
         out_lines.append(f'    {key}: [{vals}],')
 
     out_lines.append('}')
     out_text = '\n'.join(out_lines) + '\n'
     out_path = Path(args.output)
-    out_path.write_text(out_text, encoding='utf-8')
+    # 1回だけ UTF-8 にエンコードしてバイナリで書き込む（改行は常に LF）
+    out_path.write_bytes(out_text.encode('utf-8'))
     print(f'書き出しました: {out_path} (files={len(files)}, glyphs={len(glyph_rows_list)}, start={start})')
 
 if __name__ == '__main__':